@@ -0,0 +1,420 @@
+"""
+Load-test harness and capacity model for the nso_vortex upload and status endpoints.
+
+Starts the project under gunicorn (WSGI) or uvicorn (ASGI) with
+nso_vortex.settings_loadtest, where Whisper and Gemini are replaced by stubs
+with configurable latency, then drives start-analysis/ and
+tasks/<id>/status/ with synthetic media, either closed-loop at increasing
+concurrency levels or open-loop at fixed Poisson arrival rates (--rates),
+where requests keep arriving whether or not earlier ones have finished.
+
+For each level it reports throughput, p50/p95/p99 latency, the time spent in
+the view and waiting on the server, server queue depth and peak RSS per
+server worker, and compares the results with a simple capacity model. The
+view time comes from the X-View-Seconds header that the load-test settings
+add (meeting_analyzer.middleware.ViewTimingMiddleware); the wait is the
+client's latency minus that, and the queue depth follows from Little's law
+as throughput x mean wait. This works the same under gunicorn, where
+requests wait in the listen backlog, and uvicorn, where they wait for a thread.
+
+Example:
+    python load_test.py --server wsgi --workers 4 --concurrency 1,4,8,16
+    python load_test.py --server asgi --workers 4 --whisper-latency 5 --llm-latency 2
+    python load_test.py --server wsgi --workers 2 --rates 0.2,0.5,1.0 --requests 40
+    python load_test.py --server external --url http://127.0.0.1:8000/
+"""
+
+import argparse
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_SPEAKERS = ["Thowfiq", "Siddharth Baid", "Amar", "Aditya", "Ankita Thakur"]
+SAMPLE_WORDS = ("landlord confirmed store size signage width front trade area khata "
+                "property approved rent ceiling height lift entrance parking").split()
+
+
+# --- SYNTHETIC MEDIA ---
+
+def write_synthetic_media(directory: str, video_mb: float, turns: int) -> Dict[str, str]:
+    """Writes a fake video, a fake PPT and a Google Meet style transcript; returns their paths."""
+    rng = random.Random(42)
+    paths = {
+        "video_file": os.path.join(directory, "meeting.mp4"),
+        "ppt_file": os.path.join(directory, "property.pptx"),
+        "transcript_file": os.path.join(directory, "transcript_google.txt"),
+    }
+
+    with open(paths["video_file"], "wb") as f:
+        f.write(os.urandom(int(video_mb * 1024 * 1024)))
+    with open(paths["ppt_file"], "wb") as f:
+        f.write(os.urandom(256 * 1024))
+
+    lines = ["Initial people present at 10:00:00 AM:"]
+    lines += [f"\t{name}" for name in SAMPLE_SPEAKERS]
+    lines += ["", "Transcript, started at 10:00:00 AM:", "_" * 80]
+    for i in range(turns):
+        seconds = 5 + i * 7
+        clock = f"10:{seconds // 60:02d}:{seconds % 60:02d} AM" if seconds < 3600 else "10:59:59 AM"
+        text = " ".join(rng.choice(SAMPLE_WORDS) for _ in range(rng.randint(6, 30)))
+        lines.append(f"<{clock}> {rng.choice(SAMPLE_SPEAKERS)}: {text}")
+    with open(paths["transcript_file"], "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+    return paths
+
+
+# --- SERVER PROCESS ---
+
+def start_server(kind: str, workers: int, threads: int, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Runs migrations on the scratch database and starts gunicorn or uvicorn."""
+    subprocess.run([sys.executable, "manage.py", "migrate", "--noinput"],
+                   cwd=BASE_DIR, env=env, check=True, capture_output=True)
+
+    if kind == "wsgi":
+        command = [sys.executable, "-m", "gunicorn", "nso_vortex.wsgi:application",
+                   "--bind", f"127.0.0.1:{port}", "--workers", str(workers),
+                   "--threads", str(threads), "--timeout", "600"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "nso_vortex.asgi:application",
+                   "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+                   "--log-level", "warning"]
+
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}/"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{command[2]} exited early; is it installed? ({' '.join(command)})")
+        try:
+            requests.get(f"{base_url}search/?q=warmup", timeout=1)
+            return process
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not start on {base_url} within 30s.")
+
+
+def _rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _worker_pids(pid: int) -> List[int]:
+    """Children of the server supervisor that serve requests."""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The parent pid is the second field after the parenthesised command name.
+                if int(f.read().rsplit(")", 1)[1].split()[1]) != pid:
+                    continue
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                # uvicorn's multiprocessing also starts a resource tracker, which is not a worker.
+                if b"resource_tracker" in f.read():
+                    continue
+            children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+class MemorySampler(threading.Thread):
+    """Samples the peak RSS of each server worker process (Linux /proc only)."""
+
+    def __init__(self, server_pid: Optional[int], interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.server_pid = server_pid
+        self.interval = interval
+        self.peak_rss: Dict[int, float] = {}
+        self.stopped = threading.Event()
+
+    def run(self):
+        if not self.server_pid or not os.path.isdir("/proc"):
+            return
+        while not self.stopped.is_set():
+            # gunicorn and uvicorn fork their workers from a supervisor process.
+            pids = _worker_pids(self.server_pid) or [self.server_pid]
+            for pid in pids:
+                self.peak_rss[pid] = max(self.peak_rss.get(pid, 0.0), _rss_mb(pid))
+            self.stopped.wait(self.interval)
+
+    def stop(self) -> Dict[int, float]:
+        self.stopped.set()
+        self.join()
+        return self.peak_rss
+
+
+# --- LOAD GENERATION ---
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def run_level(base_url: str, media: Dict[str, str], total: int, server_pid: Optional[int],
+              concurrency: int = 0, rate: float = 0.0) -> Dict[str, Any]:
+    """
+    Sends `total` analyses and collects metrics. With `concurrency`, that many
+    clients each wait for their answer before sending again (closed loop); with
+    `rate`, requests arrive as a Poisson process at that many per second (open loop).
+    """
+    upload_latencies: List[float] = []
+    view_times: List[float] = []
+    waits: List[float] = []
+    status_latencies: List[float] = []
+    errors: List[str] = []
+    in_flight = [0]
+    lock = threading.Lock()
+
+    def one_request():
+        with lock:
+            in_flight[0] += 1
+        started = time.perf_counter()
+        try:
+            with open(media["ppt_file"], "rb") as ppt, open(media["video_file"], "rb") as video, \
+                    open(media["transcript_file"], "rb") as transcript:
+                response = requests.post(f"{base_url}start-analysis/", timeout=900, files={
+                    "ppt_file": ppt, "video_file": video, "transcript_file": transcript})
+            elapsed = time.perf_counter() - started
+            body = response.json()
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}: {body.get('error')}")
+            upload_latencies.append(elapsed)
+            if "X-View-Seconds" in response.headers:
+                view_time = float(response.headers["X-View-Seconds"])
+                view_times.append(view_time)
+                waits.append(max(0.0, elapsed - view_time))
+
+            started = time.perf_counter()
+            status = requests.get(f"{base_url}tasks/{body['task_id']}/status/", timeout=60)
+            status_latencies.append(time.perf_counter() - started)
+            if status.json().get("status") != "Completed":
+                raise RuntimeError(f"Task {body['task_id']} status is {status.json().get('status')}")
+        except Exception as e:
+            errors.append(str(e))
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    in_flight_samples: List[int] = []
+    sampling = threading.Event()
+
+    def sample_in_flight():
+        while not sampling.is_set():
+            in_flight_samples.append(in_flight[0])
+            sampling.wait(0.05)
+
+    sampler = threading.Thread(target=sample_in_flight, daemon=True)
+    memory = MemorySampler(server_pid)
+    sampler.start()
+    memory.start()
+
+    started = time.perf_counter()
+    if rate:
+        arrivals = random.Random(7)
+        with ThreadPoolExecutor(max_workers=total) as pool:
+            for _ in range(total):
+                pool.submit(one_request)
+                time.sleep(arrivals.expovariate(rate))
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(total):
+                pool.submit(one_request)
+    wall_time = time.perf_counter() - started
+
+    sampling.set()
+    sampler.join()
+    peak_rss = memory.stop()
+
+    throughput = len(upload_latencies) / wall_time if wall_time else 0.0
+    timed = bool(view_times)
+    return {
+        "concurrency": concurrency,
+        "rate": rate,
+        "label": f"{rate:g}/s" if rate else str(concurrency),
+        "requests": total,
+        "errors": errors,
+        "throughput": throughput,
+        "p50": percentile(upload_latencies, 50),
+        "p95": percentile(upload_latencies, 95),
+        "p99": percentile(upload_latencies, 99),
+        "status_p50": percentile(status_latencies, 50),
+        "status_p99": percentile(status_latencies, 99),
+        # Server-side figures need the X-View-Seconds header; None without it.
+        "view_mean": sum(view_times) / len(view_times) if timed else None,
+        "wait_p95": percentile(waits, 95) if timed else None,
+        # Little's law: requests in service = X * mean view time, waiting = X * mean wait.
+        "busy": throughput * sum(view_times) / len(view_times) if timed else None,
+        "server_queue": throughput * sum(waits) / len(waits) if timed else None,
+        "in_flight_max": max(in_flight_samples, default=0),
+        "rss_per_worker": peak_rss,
+    }
+
+
+# --- REPORTING ---
+
+def _baseline(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The least loaded level: concurrency 1 if it was run, else the lowest concurrency or rate."""
+    measured = [r for r in results if r["p50"]]
+    single = [r for r in measured if r["concurrency"] == 1]
+    return single[0] if single else min(measured, key=lambda r: r["rate"] or r["concurrency"], default=None)
+
+
+def print_report(results: List[Dict[str, Any]], slots: Optional[int], kind: str):
+    print(f"\n=== Load test results ({kind}) ===")
+    print(f"{'load':>7} {'reqs':>5} {'err':>4} {'req/s':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+          f"{'view s':>7} {'wait p95 s':>10} {'busy':>5} {'queue':>6} {'in flight max':>13} "
+          f"{'status p50 ms':>14} {'peak RSS/worker MB':>20}")
+
+    def number(value, width, digits):
+        return f"{value:>{width}.{digits}f}" if value is not None else f"{'n/a':>{width}}"
+
+    for r in results:
+        rss = r["rss_per_worker"]
+        rss_text = f"{max(rss.values()):.0f} x{len(rss)}" if rss else "n/a"
+        print(f"{r['label']:>7} {r['requests']:>5} {len(r['errors']):>4} {r['throughput']:>7.2f} "
+              f"{r['p50']:>7.2f} {r['p95']:>7.2f} {r['p99']:>7.2f} {number(r['view_mean'], 7, 2)} "
+              f"{number(r['wait_p95'], 10, 2)} {number(r['busy'], 5, 1)} {number(r['server_queue'], 6, 1)} "
+              f"{r['in_flight_max']:>13} {r['status_p50'] * 1000:>14.1f} {rss_text:>20}")
+    timed = all(r["view_mean"] is not None for r in results if r["p50"])
+    if not timed:
+        print("  (no X-View-Seconds header; add meeting_analyzer.middleware.ViewTimingMiddleware to the "
+              "server's MIDDLEWARE to measure view time and server-side queueing)")
+
+    for r in results:
+        for error in sorted(set(r["errors"]))[:3]:
+            print(f"  [load {r['label']}] error: {error}")
+
+    # Capacity model (Little's law): with S the uncontended service time and
+    # `slots` requests served in parallel, throughput saturates at slots / S.
+    # Closed loop: latency grows roughly as ceil(concurrency / slots) * S.
+    # Open loop: at utilization rate * S / slots >= 1 the queue grows without bound.
+    baseline = _baseline(results)
+    if not baseline:
+        return
+    if timed:
+        service_time, source = baseline["view_mean"], "mean view time"
+    else:
+        service_time, source = baseline["p50"], "p50 latency"
+    if not slots:
+        # Without a configured limit, use the most requests the server was seen serving at once.
+        slots = max(1, round(max(r["busy"] or 0.0 for r in results))) if timed else None
+        slot_note = "observed peak in service; pass --slots if the server has a fixed limit"
+    else:
+        slot_note = "configured"
+    print(f"\nCapacity model: service time S = {service_time:.2f}s ({source} at load {baseline['label']})")
+    if not slots:
+        print("  parallel slots unknown; pass --slots or enable X-View-Seconds for the model")
+        return
+    print(f"  {slots} parallel slots ({slot_note})")
+    print(f"  predicted max throughput = {slots / service_time:.2f} req/s "
+          f"({slots / service_time * 3600:.0f} analyses/hour)")
+    for r in results:
+        if r["rate"]:
+            utilization = r["rate"] * service_time / slots
+            verdict = "saturated, queue keeps growing" if utilization >= 1 else "stable"
+            queue = f", server queue {r['server_queue']:.1f}" if r["server_queue"] is not None else ""
+            print(f"  rate {r['rate']:>5g}/s: utilization {utilization:5.2f} ({verdict}), "
+                  f"observed p95 {r['p95']:6.2f}s{queue}")
+        else:
+            predicted = -(-r["concurrency"] // slots) * service_time
+            print(f"  conc {r['concurrency']:>3}: predicted p50 {predicted:6.2f}s, observed {r['p50']:6.2f}s")
+    knee = next((r["label"] for r in results if r["p95"] > 2 * service_time), None)
+    if knee:
+        print(f"  p95 latency exceeds 2x S from load {knee}: the node is saturated there.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["wsgi", "asgi", "external"], default="wsgi")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/", help="Base URL when --server external.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="Server worker processes.")
+    parser.add_argument("--threads", type=int, default=1, help="Threads per gunicorn worker (WSGI only).")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated client concurrency levels.")
+    parser.add_argument("--rates", default="",
+                        help="Comma-separated open-loop arrival rates (req/s); replaces --concurrency. "
+                             "The service time baseline is then measured with one client first.")
+    parser.add_argument("--requests", type=int, default=0,
+                        help="Requests per level (default: 4x the concurrency, at least 8; 20 for --rates).")
+    parser.add_argument("--slots", type=int, default=0,
+                        help="Requests the server handles in parallel (default: workers x threads "
+                             "for wsgi; otherwise the most requests observed in service at once).")
+    parser.add_argument("--whisper-latency", type=float, default=2.0, help="Stubbed Whisper seconds per call.")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Stubbed Gemini seconds per call.")
+    parser.add_argument("--video-mb", type=float, default=5.0, help="Size of the synthetic video upload.")
+    parser.add_argument("--turns", type=int, default=200, help="Speaker turns in the synthetic transcript.")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    rates = [float(rate) for rate in args.rates.split(",") if rate]
+    scratch_dir = tempfile.mkdtemp(prefix="nso_loadtest_")
+    media = write_synthetic_media(scratch_dir, args.video_mb, args.turns)
+    process = None
+
+    try:
+        if args.server == "external":
+            base_url = args.url if args.url.endswith("/") else args.url + "/"
+            # Unknown deployment unless told; the report falls back to the observed parallelism.
+            slots = args.slots or None
+        else:
+            env = dict(os.environ,
+                       DJANGO_SETTINGS_MODULE="nso_vortex.settings_loadtest",
+                       NSO_LOADTEST_DIR=os.path.join(scratch_dir, "server"),
+                       NSO_STUB_WHISPER_LATENCY=str(args.whisper_latency),
+                       NSO_STUB_LLM_LATENCY=str(args.llm_latency))
+            os.makedirs(env["NSO_LOADTEST_DIR"], exist_ok=True)
+            process = start_server(args.server, args.workers, args.threads, args.port, env)
+            base_url = f"http://127.0.0.1:{args.port}/"
+            # Under ASGI, Django gives each request its own thread for sync views, so
+            # parallelism is not bounded by the worker count; the report measures it instead.
+            slots = args.slots or (args.workers * args.threads if args.server == "wsgi" else None)
+
+        server_pid = process.pid if process else None
+        results = []
+        if rates:
+            # A single closed-loop client gives the uncontended service time for the model.
+            print(f"Measuring service time with 1 client against {base_url} ...")
+            results.append(run_level(base_url, media, args.requests or 8, server_pid, concurrency=1))
+        for rate in rates:
+            total = args.requests or 20
+            print(f"Running {total} analyses arriving at {rate:g}/s against {base_url} ...")
+            results.append(run_level(base_url, media, total, server_pid, rate=rate))
+        for concurrency in ([] if rates else levels):
+            total = args.requests or max(8, 4 * concurrency)
+            print(f"Running {total} analyses at concurrency {concurrency} against {base_url} ...")
+            results.append(run_level(base_url, media, total, server_pid, concurrency=concurrency))
+        print_report(results, slots, args.server)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# meeting_analyzer/middleware.py
+
+import time
+
+
+class ViewTimingMiddleware:
+    """
+    Adds an X-View-Seconds header with the time spent inside the view.
+    Installed last in the load-test settings so it times only the view: the
+    client's latency minus this is the time the request waited on the server
+    (in the listen backlog for a free worker, or for a thread under ASGI).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        response["X-View-Seconds"] = f"{time.perf_counter() - started:.6f}"
+        return response
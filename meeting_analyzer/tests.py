@@ -1,3 +1,427 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from array import array
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .models import AnalysisTask
+from .workflows import langgraph_agent, prompt_budget, search_index, speaker_attribution
+
+
+def _report(summary, site, decision="approved"):
+    return {
+        "summary": summary,
+        "action_items": ["Call the landlord"],
+        "property_data": {"Site Name": site},
+        "final_decision": decision,
+    }
+
+
+class SearchIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, "index", "meetings.sqlite3")
+        search_index.index_meeting(self.index_path, "run-1", _report("Signage width discussed", "Koramangala"),
+                                   "Thowfiq: front signage is 18 feet wide", "/media/reports/run-1.pdf")
+        search_index.index_meeting(self.index_path, "run-2", _report("Lease terms and rent", "Indiranagar", "rejected"),
+                                   "Amar: the rent is too high for this site")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fts_finds_transcript_and_property_data(self):
+        result = search_index.search_meetings(self.index_path, "signage")
+        self.assertEqual([hit["run_uuid"] for hit in result["results"]], ["run-1"])
+        self.assertEqual(result["results"][0]["report_url"], "/media/reports/run-1.pdf")
+        self.assertIn("[", result["results"][0]["snippet"])
+
+        result = search_index.search_meetings(self.index_path, "Indiranagar")
+        self.assertEqual([hit["run_uuid"] for hit in result["results"]], ["run-2"])
+
+    def test_fts_scores_are_not_rounded_away(self):
+        search_index.index_meeting(self.index_path, "run-3", _report("Signage and more signage", "HSR"),
+                                   "signage signage signage")
+        hits = search_index.search_meetings(self.index_path, "signage")["results"]
+        self.assertEqual(len(hits), 2)
+        self.assertTrue(all(hit["score"] != 0 for hit in hits))
+        self.assertGreater(hits[0]["score"], hits[1]["score"])
+
+    def test_reindexing_a_run_replaces_it(self):
+        search_index.index_meeting(self.index_path, "run-1", _report("Parking only", "Koramangala"),
+                                   "nothing about boards")
+        self.assertEqual(search_index.search_meetings(self.index_path, "signage")["results"], [])
+        hits = search_index.search_meetings(self.index_path, "parking")["results"]
+        self.assertEqual([hit["run_uuid"] for hit in hits], ["run-1"])
+
+    def test_hostile_queries_are_quoted(self):
+        for query in ['signage"', "signage OR", "NEAR(signage", "*", "site: -rent", "' ; DROP TABLE meetings; --"]:
+            result = search_index.search_meetings(self.index_path, query)
+            self.assertIsInstance(result["results"], list)
+        self.assertEqual(len(search_index.search_meetings(self.index_path, 'signage"')["results"]), 1)
+        self.assertEqual(search_index.search_meetings(self.index_path, "*")["results"], [])
+
+    @unittest.skipIf(search_index.np is None, "numpy is not installed")
+    def test_vector_hits_leave_transcript_out(self):
+        hits = search_index.search_meetings(self.index_path, "rent site", mode="vector")["results"]
+        self.assertEqual(hits[0]["run_uuid"], "run-2")
+        self.assertEqual(hits[0]["snippet"], "")
+        self.assertNotIn("fused_transcript", hits[0])
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            search_index.search_meetings(self.index_path, "signage", mode="fuzzy")
+
+    @unittest.skipIf(search_index.np is None, "numpy is not installed")
+    def test_hybrid_merges_both_rankings(self):
+        result = search_index.search_meetings(self.index_path, "rent site", mode="hybrid")
+        run_ids = [hit["run_uuid"] for hit in result["results"]]
+        self.assertEqual(run_ids[0], "run-2")
+        self.assertEqual(len(run_ids), len(set(run_ids)))
+        self.assertTrue(result["results"][0]["snippet"])
+
+    @unittest.skipIf(search_index.np is None, "numpy is not installed")
+    def test_vector_cache_sees_meetings_indexed_elsewhere(self):
+        self.assertEqual(len(search_index.search_meetings(self.index_path, "parking", mode="vector")["results"]), 0)
+        # Another worker process writes to the shared index file; nothing in this process is told about it.
+        embedding = array("f", search_index._embed("Parking bays parking parking")).tobytes()
+        conn = sqlite3.connect(self.index_path)
+        with conn:
+            conn.execute("INSERT INTO meetings (run_uuid, created_at, summary, fused_transcript, embedding) "
+                         "VALUES (?, ?, ?, ?, ?)", ("run-3", time.time(), "Parking bays", "parking parking", embedding))
+        conn.close()
+        hits = search_index.search_meetings(self.index_path, "parking", mode="vector")["results"]
+        self.assertEqual(hits[0]["run_uuid"], "run-3")
+
+
+class SearchViewTests(SimpleTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, "meetings.sqlite3")
+        search_index.index_meeting(self.index_path, "run-1", _report("Signage width discussed", "Koramangala"),
+                                   "Thowfiq: front signage is 18 feet wide", "/media/reports/run-1.pdf")
+        override = override_settings(MEETING_INDEX_PATH=self.index_path)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_missing_query(self):
+        response = self.client.get(reverse("search"), {"q": "  "})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("'q'", response.json()["error"])
+
+    def test_bad_limit(self):
+        response = self.client.get(reverse("search"), {"q": "signage", "limit": "ten"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bad_mode(self):
+        response = self.client.get(reverse("search"), {"q": "signage", "mode": "fuzzy"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fuzzy", response.json()["error"])
+
+    def test_only_get_is_allowed(self):
+        self.assertEqual(self.client.post(reverse("search"), {"q": "signage"}).status_code, 405)
+
+    def test_returns_hits(self):
+        response = self.client.get(reverse("search"), {"q": "signage", "limit": "500"})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["mode"], "fts")
+        self.assertEqual([hit["run_uuid"] for hit in body["results"]], ["run-1"])
+        self.assertEqual(body["results"][0]["report_url"], "/media/reports/run-1.pdf")
+        self.assertEqual(body["results"][0]["property_data"], {"Site Name": "Koramangala"})
+
+
+MEET_TRANSCRIPT = """Transcript of conference held at Oct 23, 2025 in room property-approval-meeting
+Initial people present at 11:58:00 PM:
+\tThowfiq
+\tSiddharth Baid
+\tAsit
+\tAsit
+
+Transcript, started at 11:58:00 PM:
+________________________________________________________________________________
+<11:58:00 PM> Thowfiq joined the conference
+<11:58:00 PM> Siddharth Baid joined the conference
+<11:58:00 PM> Asit joined the conference
+<11:58:00 PM> Asit joined the conference
+<11:58:10 PM> Thowfiq: landlord has confirmed the store size is 1950 with
+                       an eighteen foot signage width and ceiling height of
+                       eleven point three
+<11:58:11 PM> Siddharth Baid: khata received for this property
+<11:58:20 PM> Amar joined the conference
+<11:58:25 PM> Amar: I dont have a doubt
+<11:58:40 PM> Amar joined the conference
+<11:58:50 PM> Amar left the conference
+<11:59:00 PM> Asit left the conference
+<11:59:30 PM> Siddharth Baid left the conference
+<12:00:10 AM> Amar: before this property the sale was good
+<12:00:30 AM> Thowfiq: parking is available behind the building
+________________________________________________________________________________
+"""
+
+
+def _split_into_segments(meet, shift=0.0):
+    """Turns Meet turns into Whisper-like segments of up to ten words at 2.5 words/s."""
+    segments, speakers = [], []
+    for utterance in meet.utterances:
+        words = utterance.text.split()
+        for i in range(0, len(words), 10):
+            start = utterance.start + i / 2.5 - shift
+            chunk = words[i:i + 10]
+            segments.append({"start": start, "end": start + len(chunk) / 2.5, "text": " ".join(chunk)})
+            speakers.append(utterance.speaker)
+    return {"segments": segments}, speakers
+
+
+class SpeakerAttributionTests(SimpleTestCase):
+
+    def setUp(self):
+        self.meet = speaker_attribution.parse_meet_transcript(MEET_TRANSCRIPT)
+
+    def test_parses_turns_and_wrapped_lines(self):
+        speakers = [u.speaker for u in self.meet.utterances]
+        self.assertEqual(speakers, ["Thowfiq", "Siddharth Baid", "Amar", "Amar", "Thowfiq"])
+        opening = self.meet.utterances[0]
+        self.assertEqual(opening.start, 10.0)
+        self.assertTrue(opening.text.endswith("ceiling height of eleven point three"))
+        # Turn length comes from the word count, so it overlaps the next turn.
+        self.assertGreater(opening.end, self.meet.utterances[1].start)
+
+    def test_times_continue_past_midnight(self):
+        self.assertEqual([u.start for u in self.meet.utterances[-2:]], [130.0, 150.0])
+
+    def test_roster_and_repeated_joins(self):
+        # The start-of-meeting join events repeat the roster and are not counted twice.
+        self.assertEqual(self.meet.presence["Siddharth Baid"], [(0.0, 90.0)])
+        # Asit had two connections in the roster; one leaving does not remove him.
+        self.assertTrue(self.meet.is_present("Asit", 100.0))
+        # Amar joined twice and left once, so he is still present.
+        self.assertEqual(self.meet.presence["Amar"], [(20.0, None)])
+        self.assertTrue(self.meet.is_present("Amar", 130.0))
+        self.assertFalse(self.meet.is_present("Siddharth Baid", 120.0))
+
+    def test_attributes_overlapping_long_turns(self):
+        whisper_output, speakers = _split_into_segments(self.meet)
+        weights = speaker_attribution._word_weights(self.meet)
+        picked = [speaker_attribution._pick_speaker(self.meet, s["start"], s["end"], s["text"], weights)
+                  for s in whisper_output["segments"]]
+        self.assertEqual(picked, speakers)
+
+    def test_estimates_video_offset(self):
+        for shift in (0.0, 20.0, -15.0):
+            whisper_output, _ = _split_into_segments(self.meet, shift)
+            self.assertAlmostEqual(speaker_attribution.estimate_offset(whisper_output, self.meet), shift, delta=1.0)
+
+    def test_non_meet_transcripts_are_not_attributed(self):
+        whisper_output, _ = _split_into_segments(self.meet)
+        for google in ("10:36:34 Thowfiq: landlord has confirmed", '[{"speaker": "Thowfiq", "text": "hi"}]'):
+            self.assertEqual(speaker_attribution.parse_meet_transcript(google).utterances, [])
+            with self.assertRaises(ValueError):
+                speaker_attribution.attribute_speakers(whisper_output, google)
+
+    def test_attribute_speakers_with_shifted_video(self):
+        whisper_output, _ = _split_into_segments(self.meet, shift=5.0)
+        lines = speaker_attribution.attribute_speakers(whisper_output, MEET_TRANSCRIPT).splitlines()
+        self.assertEqual([line.split("] ", 1)[1].split(":")[0] for line in lines],
+                         ["Thowfiq", "Siddharth Baid", "Amar", "Thowfiq"])
+        # Output timestamps stay relative to the video.
+        self.assertTrue(lines[0].startswith("[00:05] Thowfiq: landlord has confirmed"))
+
+
+SAMPLE_TRANSCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "data", "transcript_google.txt")
+
+
+class PromptBudgetTests(SimpleTestCase):
+
+    def setUp(self):
+        with open(SAMPLE_TRANSCRIPT, encoding="utf-8") as f:
+            self.sample = speaker_attribution.compact_meet_transcript(f.read())
+
+    def test_under_budget_is_unchanged(self):
+        text = "[00:01] A: ok\n[00:02] A: ok\n[00:03] B: yes"
+        result = prompt_budget.compact_transcript(text, 1000)
+        self.assertEqual(result.text, text)
+        self.assertEqual(result.dropped_backchannel, 0)
+
+    def test_answers_to_other_speakers_are_kept(self):
+        filler = "[00:10] C: " + " ".join(["the store frontage discussion continues"] * 20)
+        text = "\n".join([
+            "[00:01] A: Is the site approved for signage?", "[00:02] B: Yes.", filler,
+            "[00:40] A: So the final answer is no?", "[00:41] B: Right.",
+            "[00:50] A: 1950", "[00:51] B: 1950",
+        ])
+        result = prompt_budget.compact_transcript(text, prompt_budget.count_tokens(text) - 1)
+        for line in ("B: Yes.", "B: Right.", "A: 1950", "B: 1950"):
+            self.assertIn(line, result.text)
+        self.assertEqual(result.dropped_backchannel, 0)
+
+    def test_same_speaker_backchannel_run_is_collapsed(self):
+        text = "[00:01] A: Rent is 6935 per month\n[00:02] B: ok sir\n[00:03] B: yes sir\n[00:04] A: Landlord agreed"
+        result = prompt_budget.compact_transcript(text, prompt_budget.count_tokens(text) - 1)
+        self.assertEqual(result.dropped_backchannel, 1)
+        self.assertIn("B: ok sir", result.text)
+        self.assertNotIn("yes sir", result.text)
+
+    def test_keeps_the_opening_facts_on_the_sample(self):
+        result = prompt_budget.compact_transcript(self.sample, 300)
+        self.assertLessEqual(result.tokens_after, 300)
+        self.assertIn("Thowfiq: Sar dis property is from Bangalore", result.text)
+        self.assertNotIn("00:16", " ".join(result.dropped_spans))
+        self.assertIn("lines omitted", result.text)
+
+    def test_rendered_text_respects_small_budgets(self):
+        for budget in (0, 5, 10, 20, 50, 150, 300, 1000):
+            result = prompt_budget.compact_transcript(self.sample, budget)
+            self.assertLessEqual(result.tokens_after, budget)
+            self.assertEqual(result.tokens_after, prompt_budget.count_tokens(result.text))
+
+    def test_fit_sections_shares_the_budget(self):
+        sections = {"google": self.sample, "whisper": self.sample[:len(self.sample) // 3]}
+        for budget in (10, 300, 2000):
+            fitted = prompt_budget.fit_sections(sections, budget)
+            self.assertLessEqual(sum(s.tokens_after for s in fitted.values()), budget)
+        fitted = prompt_budget.fit_sections(sections, 2000)
+        self.assertGreater(fitted["google"].tokens_after, fitted["whisper"].tokens_after)
+        fitted = prompt_budget.fit_sections(sections, 10 ** 6)
+        self.assertEqual(fitted["google"].text, self.sample)
+
+    def test_chunks_stay_under_the_limit_and_keep_every_word(self):
+        text = self.sample + "\n[20:00] A: " + "word " * 400
+        chunks = prompt_budget.chunk_transcript(text, 200)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(prompt_budget.count_tokens(chunk) <= 200 for chunk in chunks))
+        self.assertEqual(" ".join(chunks).split(), text.split())
+
+    def test_transcript_window(self):
+        window = prompt_budget.transcript_window(self.sample, 60, 120)
+        self.assertTrue(window)
+        self.assertTrue(all(60 <= t <= 120 for t in prompt_budget.transcript_times(window)))
+
+
+class TranscriptFusionTests(SimpleTestCase):
+
+    def _state(self, diarized, google_transcript=MEET_TRANSCRIPT, speakers_attributed=True):
+        return langgraph_agent.WorkflowState(google_transcript=google_transcript, ppt_path="", video_path="",
+                                             temp_dir="", diarized_transcript=diarized,
+                                             speakers_attributed=speakers_attributed, video_offset=10.0)
+
+    def _fuse(self, diarized, finish_reason="STOP", **state):
+        self.prompts = []
+
+        def batch(messages):
+            self.prompts += [m[1].content for m in messages]
+            return [SimpleNamespace(content=m[1].content.rsplit("Whisper Transcript ---\n", 1)[1],
+                                    response_metadata={"finish_reason": finish_reason}) for m in messages]
+        with mock.patch.object(langgraph_agent, "FUSION_CHUNK_TOKENS", 40):
+            return langgraph_agent.fuse_transcripts(self._state(diarized, **state), model=SimpleNamespace(batch=batch))
+
+    def test_long_transcripts_are_fused_in_chunks(self):
+        diarized = "\n".join(f"[00:{i:02d}] Thowfiq: landlord has confirmed the store size is 1950"
+                             for i in range(0, 60, 2))
+        result = self._fuse(diarized)
+        self.assertEqual(result["fused_transcript"], diarized)
+        self.assertGreater(len(result["prompt_budget_log"]), 1)
+        self.assertFalse(any(entry["output_truncated"] for entry in result["prompt_budget_log"]))
+
+    def test_truncated_output_is_an_error(self):
+        result = self._fuse("[00:00] Thowfiq: landlord has confirmed", finish_reason="MAX_TOKENS")
+        self.assertIn("max_tokens", result["error_message"])
+        self.assertNotIn("fused_transcript", result)
+        self.assertTrue(result["prompt_budget_log"][0]["output_truncated"])
+
+    def test_non_meet_transcript_is_diarized_by_fusion(self):
+        google = json.dumps([{"time": "10:36:34", "speaker": "Thowfiq", "text": "landlord has confirmed"}])
+        whisper_output = {"segments": [{"start": 0.0, "end": 2.0, "text": "landlord has confirmed"},
+                                       {"start": 2.5, "end": 4.0, "text": "I dont have a doubt"}]}
+        state = langgraph_agent.WorkflowState(google_transcript=google, ppt_path="", video_path="", temp_dir="",
+                                              whisper_transcript=json.dumps(whisper_output))
+        attributed = langgraph_agent.attribute_whisper_speakers(state)
+        self.assertFalse(attributed["speakers_attributed"])
+        self.assertEqual(attributed["diarized_transcript"],
+                         "[00:00] landlord has confirmed\n[00:02] I dont have a doubt")
+
+        result = self._fuse(attributed["diarized_transcript"], google_transcript=google, speakers_attributed=False)
+        self.assertEqual(result["fused_transcript"], attributed["diarized_transcript"])
+        self.assertIn("assign a speaker to every line", self.prompts[0])
+        self.assertIn('"speaker": "Thowfiq"', self.prompts[0])
+
+    def test_failed_analysis_keeps_its_budget_entry(self):
+        def with_structured_output(schema):
+            raise RuntimeError("quota exceeded")
+        state = self._state("[00:00] Thowfiq: landlord has confirmed")
+        state.fused_transcript = state.diarized_transcript
+        state.prompt_budget_log = [{"call": "transcript_fusion 1/1"}]
+        result = langgraph_agent.analyze_meeting(
+            state, model=SimpleNamespace(with_structured_output=with_structured_output))
+        self.assertIn("quota exceeded", result["error_message"])
+        self.assertEqual([entry["call"] for entry in result["prompt_budget_log"]],
+                         ["transcript_fusion 1/1", "meeting_analysis"])
+
+
+class AnalysisTaskViewTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        override = override_settings(MEDIA_ROOT=self.media_root,
+                                     MEETING_INDEX_PATH=os.path.join(self.media_root, "index.sqlite3"),
+                                     ANALYZER_STUB_LATENCY={"whisper": 0.0, "llm": 0.0})
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _upload(self, transcript):
+        return self.client.post(reverse("start_analysis"), {
+            "ppt_file": SimpleUploadedFile("property.pptx", b"ppt"),
+            "video_file": SimpleUploadedFile("meeting.mp4", b"video"),
+            "transcript_file": SimpleUploadedFile("transcript.txt", transcript.encode("utf-8")),
+        })
+
+    def test_unknown_task_is_404(self):
+        response = self.client.get(reverse("task_status", args=[12345]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_completed_analysis_keeps_the_task_and_deletes_uploads(self):
+        response = self._upload(MEET_TRANSCRIPT)
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(body["status"], "success")
+        self.assertEqual([entry["call"] for entry in body["prompt_budget_log"]],
+                         ["transcript_fusion 1/1", "meeting_analysis"])
+
+        task = AnalysisTask.objects.get(pk=body["task_id"])
+        self.assertEqual(task.status, "Completed")
+        self.assertTrue(os.path.exists(task.report_file.path))
+        for upload in (task.ppt_file, task.video_file, task.transcript_file):
+            self.assertFalse(upload.storage.exists(upload.name))
+
+        status = self.client.get(reverse("task_status", args=[task.id])).json()
+        self.assertEqual(status, {"task_id": task.id, "status": "Completed", "report_url": body["report_url"]})
+        hits = search_index.search_meetings(os.path.join(self.media_root, "index.sqlite3"), "landlord")
+        self.assertEqual(len(hits["results"]), 1)
+
+    def test_failed_analysis_is_recorded(self):
+        # The stubbed Whisper finds no speech in a transcript without Meet turns.
+        response = self._upload("just some notes")
+        self.assertEqual(response.status_code, 500)
+        body = response.json()
+        self.assertEqual(body["status"], "failed")
+        self.assertEqual(AnalysisTask.objects.get(pk=body["task_id"]).status, "Failed")
+        status = self.client.get(reverse("task_status", args=[body["task_id"]])).json()
+        self.assertEqual(status["status"], "Failed")
+        self.assertIsNone(status["report_url"])
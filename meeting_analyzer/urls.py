@@ -6,4 +6,6 @@ from . import views
 urlpatterns = [
     path('', views.analysis_ui, name='analysis_ui'),
     path('start-analysis/', views.start_analysis, name='start_analysis'),
+    path('tasks/<int:task_id>/status/', views.task_status, name='task_status'),
+    path('search/', views.search, name='search'),
 ]
\ No newline at end of file
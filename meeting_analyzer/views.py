@@ -7,6 +7,7 @@ from django.conf import settings
 # Import the workflow components from the local modules
 from .workflows.langgraph_agent import define_workflow, WorkflowState, load_file_content
 from .workflows.report_generator import generate_pdf_report
+from .workflows.search_index import index_meeting, search_meetings
 from .models import AnalysisTask
 import os
 import uuid
@@ -75,15 +76,22 @@ def start_analysis(request):
         return JsonResponse({"error": f"Initialization failed: {e}"}, status=400)
 
     # --- RUN THE LANGGRAPH WORKFLOW ---
+    task.status = 'Processing'
+    task.save(update_fields=['status'])
+
     try:
-        app = define_workflow()
+        app = define_workflow(stub_latency=settings.ANALYZER_STUB_LATENCY)
 
         print(f"Starting analysis for run {run_uuid}...")
         final_state_dict = app.invoke(initial_state.dict())
         final_state = WorkflowState(**final_state_dict)
 
         if final_state.error_message:
-            return JsonResponse({"status": "failed", "error": final_state.error_message}, status=500)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            task.status = 'Failed'
+            task.save(update_fields=['status'])
+            return JsonResponse({"status": "failed", "task_id": task.id, "error": final_state.error_message,
+                                 "prompt_budget_log": final_state.prompt_budget_log}, status=500)
 
         # --- GENERATE FINAL REPORT ---
         report_filename = f"analysis_{run_uuid}.pdf"
@@ -92,18 +100,76 @@ def start_analysis(request):
         report_path = os.path.join(report_storage_dir, report_filename)
 
         generate_pdf_report(final_state.analysis_report, report_path)
+        report_url = f"{settings.MEDIA_URL}reports/{report_filename}"
+
+        # --- INDEX FOR SEARCH (a failure here must not lose the finished report) ---
+        try:
+            index_meeting(settings.MEETING_INDEX_PATH, run_uuid, final_state.analysis_report,
+                          final_state.fused_transcript, report_url)
+        except Exception as e:
+            print(f"Warning: failed to index run {run_uuid} for search: {e}")
 
-        # --- FINAL CLEANUP (Delete temp dir and uploaded files) ---
+        # --- FINAL CLEANUP (Delete temp dir and uploaded files; keep the task record for status lookups) ---
         shutil.rmtree(temp_dir, ignore_errors=True)
-        task.delete()
+        for upload in (task.ppt_file, task.video_file, task.transcript_file):
+            upload.storage.delete(upload.name)
+        task.report_file.name = f"reports/{report_filename}"
+        task.status = 'Completed'
+        task.save(update_fields=['report_file', 'status'])
 
         return JsonResponse({
             "status": "success",
+            "task_id": task.id,
             "message": "Analysis complete.",
-            "report_url": f"{settings.MEDIA_URL}reports/{report_filename}"
+            "report_url": report_url,
+            "prompt_budget_log": final_state.prompt_budget_log
         })
 
     except Exception as e:
         shutil.rmtree(temp_dir, ignore_errors=True)
         # We don't delete the task here to allow inspection of the failed file paths
-        return JsonResponse({"error": f"Internal workflow error: {e}"}, status=500)
\ No newline at end of file
+        task.status = 'Failed'
+        task.save(update_fields=['status'])
+        return JsonResponse({"error": f"Internal workflow error: {e}"}, status=500)
+
+
+def task_status(request, task_id):
+    """Returns the status of an analysis task and, once completed, its report URL."""
+    if request.method != 'GET':
+        return JsonResponse({"error": "Only GET requests are allowed."}, status=405)
+
+    try:
+        task = AnalysisTask.objects.get(pk=task_id)
+    except AnalysisTask.DoesNotExist:
+        return JsonResponse({"error": f"Task {task_id} not found."}, status=404)
+
+    return JsonResponse({
+        "task_id": task.id,
+        "status": task.status,
+        "report_url": task.report_file.url if task.report_file else None
+    })
+
+
+def search(request):
+    """
+    Searches past meetings by transcript, summary, property data and decision.
+    Query params: q (required), limit (default 10), mode (fts | vector | hybrid).
+    'vector' compares hashed word counts, so it is lexical like 'fts' rather than semantic.
+    """
+    if request.method != 'GET':
+        return JsonResponse({"error": "Only GET requests are allowed."}, status=405)
+
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({"error": "Missing query parameter 'q'."}, status=400)
+
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 10)), 100))
+    except ValueError:
+        return JsonResponse({"error": "'limit' must be an integer."}, status=400)
+
+    try:
+        return JsonResponse(search_meetings(settings.MEETING_INDEX_PATH, query, limit,
+                                            request.GET.get('mode', 'fts')))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
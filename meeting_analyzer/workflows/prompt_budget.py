@@ -0,0 +1,288 @@
+# meeting_analyzer/workflows/prompt_budget.py
+
+import math
+import re
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+# --- CONFIGURATION ---
+
+# When a transcript is over budget, a timestamp is kept only when at least this
+# many seconds have passed since the last one shown; the lines in between keep
+# just "Name: text".
+TIMESTAMP_EVERY_SECONDS = 30
+# Lines scoring below this carry too little content to compete with the rest;
+# they are only kept if budget is left after every substantive line.
+MIN_SALIENCE = 10.0
+
+FILLER_WORDS = {
+    "ok", "okay", "yes", "yeah", "yep", "ya", "yas", "hmm", "hm", "mm", "uh", "um", "ah",
+    "oh", "right", "sir", "sar", "fine", "sure", "thanks", "thank", "you", "good", "great",
+    "alright", "correct", "haan", "ji", "so", "and", "the", "hello", "hi", "bye",
+}
+# Words that mark a line as worth keeping when the prompt has to be shortened.
+SALIENT_WORDS = {
+    "approve", "approved", "reject", "rejected", "drop", "dropped", "decision", "final", "rent",
+    "landlord", "signage", "sign", "size", "sqft", "ft", "feet", "site", "store", "area", "ceiling",
+    "height", "frontage", "parking", "khata", "deadline", "action", "confirm", "confirmed", "lease",
+}
+
+PIECE_RE = re.compile(r"\w+|[^\w\s]")
+TIMESTAMP_RE = re.compile(r"^\[(?:(\d+):)?(\d{2}):(\d{2})\]\s*")
+SPEAKER_RE = re.compile(r"^([^:\[\]]{1,60}):\s*(.*)$")
+NUMBER_RE = re.compile(r"\d")
+
+
+class BudgetedText(BaseModel):
+    """A prompt section after compaction, with a record of everything that was removed."""
+    text: str
+    tokens_before: int
+    tokens_after: int
+    dropped_backchannel: int = 0
+    dropped_for_budget: int = 0
+    dropped_spans: List[str] = Field(default_factory=list, description="Timestamp ranges omitted to fit the budget.")
+
+
+# --- HELPER FUNCTIONS ---
+
+def count_tokens(text: str) -> int:
+    """
+    Estimates the token count locally without calling the API. Word pieces of
+    about four characters and each punctuation mark count as one token, which
+    tracks SentencePiece tokenizers closely enough for budgeting English text.
+    """
+    return sum(math.ceil(len(piece) / 4) for piece in PIECE_RE.findall(text))
+
+
+def _split_line(line: str):
+    """Splits '[MM:SS] Name: text' into (seconds or None, speaker or None, text)."""
+    seconds = None
+    match = TIMESTAMP_RE.match(line)
+    if match:
+        hours, minutes, secs = match.groups()
+        seconds = int(hours or 0) * 3600 + int(minutes) * 60 + int(secs)
+        line = line[match.end():]
+    speaker = SPEAKER_RE.match(line)
+    if speaker:
+        return seconds, speaker.group(1).strip(), speaker.group(2).strip()
+    return seconds, None, line.strip()
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def _is_filler(text: str) -> bool:
+    words = _words(text)
+    return all(word in FILLER_WORDS for word in words)
+
+
+def _rank_key(text: str, index: int):
+    """
+    Orders lines for keeping. Substantive lines come first, ranked by content
+    over the square root of their length: long lines still need to earn their
+    cost, but dense one-liners cannot crowd out a line that carries most of
+    the meeting's facts. Lines below MIN_SALIENCE follow, ranked by content.
+    """
+    salience = _salience(text)
+    if salience >= MIN_SALIENCE:
+        return (1, salience / math.sqrt(max(1, count_tokens(text))), -index)
+    return (0, salience, -index)
+
+
+def _salience(text: str) -> float:
+    """Scores a line's content: numbers and domain terms count most, then distinct words."""
+    words = _words(text)
+    return (2.0 * len(NUMBER_RE.findall(text))
+            + 3.0 * sum(word in SALIENT_WORDS for word in words)
+            + len(set(words) - FILLER_WORDS))
+
+
+def _format_clock(seconds: int) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def _render(entries: List[tuple], selected: List[int]) -> str:
+    """Renders the selected entries, thinning timestamps and marking each omitted span."""
+    lines = []
+    shown_at = None
+    previous = -1
+    for index in selected:
+        if index != previous + 1:
+            lines.append(f"[... {index - previous - 1} lines omitted ...]")
+            shown_at = None
+        previous = index
+        seconds, speaker, body = entries[index]
+        prefix = ""
+        if seconds is not None and (shown_at is None or seconds - shown_at >= TIMESTAMP_EVERY_SECONDS):
+            prefix = f"[{_format_clock(seconds)}] "
+            shown_at = seconds
+        lines.append(f"{prefix}{speaker}: {body}" if speaker else f"{prefix}{body}")
+    if entries and previous != len(entries) - 1:
+        lines.append(f"[... {len(entries) - previous - 1} lines omitted ...]")
+    return "\n".join(lines)
+
+
+def _omitted_spans(entries: List[tuple], kept: set) -> List[str]:
+    spans = []
+    span_start = None
+    for index in range(len(entries) + 1):
+        if index < len(entries) and index not in kept:
+            span_start = index if span_start is None else span_start
+        elif span_start is not None:
+            first, last = entries[span_start][0], entries[index - 1][0]
+            spans.append(f"{_format_clock(first)}-{_format_clock(last)}" if first is not None and last is not None
+                         else f"lines {span_start + 1}-{index}")
+            span_start = None
+    return spans
+
+
+# --- PUBLIC API ---
+
+def compact_transcript(text: str, token_budget: Optional[int] = None) -> BudgetedText:
+    """
+    Fits a '[MM:SS] Name: text' transcript into token_budget. Text already
+    within budget is returned unchanged. Otherwise runs of backchannel lines
+    from the same speaker are collapsed to their first line and timestamps are
+    thinned out; if that is still too long, the most salient lines are kept in
+    their original order and every omitted span is marked in the text and
+    listed in dropped_spans.
+    """
+    tokens_before = count_tokens(text)
+    if token_budget is None or tokens_before <= token_budget:
+        return BudgetedText(text=text, tokens_before=tokens_before, tokens_after=tokens_before)
+
+    entries = []  # (seconds, speaker, text)
+    dropped_backchannel = 0
+    last_seconds = None
+    for raw_line in text.splitlines():
+        if not raw_line.strip():
+            continue
+        seconds, speaker, body = _split_line(raw_line)
+        seconds = seconds if seconds is not None else last_seconds
+        last_seconds = seconds
+        # "yes sir" right after the same speaker's "ok sir" adds nothing; a
+        # backchannel answering someone else may be a decision, so it stays.
+        previous = entries[-1] if entries else None
+        if (speaker and previous and previous[1] == speaker
+                and _is_filler(body) and _is_filler(previous[2])):
+            dropped_backchannel += 1
+            continue
+        entries.append((seconds, speaker, body))
+
+    selected = list(range(len(entries)))
+    result = _render(entries, selected)
+    dropped_spans: List[str] = []
+
+    if count_tokens(result) > token_budget:
+        # Knapsack-style greedy: keep the best-ranked lines, costing each with a
+        # full timestamp and an omission marker, then trim until the rendered
+        # text really fits.
+        ranked = sorted(selected, key=lambda i: _rank_key(entries[i][2], i), reverse=True)
+        marker_cost = count_tokens(f"[... {len(entries)} lines omitted ...]")
+        keep, used = set(), 0
+        for index in ranked:
+            seconds, speaker, body = entries[index]
+            cost = count_tokens(_render([(seconds, speaker, body)], [0])) + marker_cost
+            if used + cost <= token_budget:
+                keep.add(index)
+                used += cost
+        for index in reversed(ranked):
+            if count_tokens(_render(entries, sorted(keep))) <= token_budget:
+                break
+            keep.discard(index)
+
+        selected = sorted(keep)
+        result = _render(entries, selected)
+        if count_tokens(result) > token_budget:
+            # Not even the omission marker fits.
+            result = ""
+        dropped_spans = _omitted_spans(entries, keep)
+
+    return BudgetedText(
+        text=result,
+        tokens_before=tokens_before,
+        tokens_after=count_tokens(result),
+        dropped_backchannel=dropped_backchannel,
+        dropped_for_budget=len(entries) - len(selected),
+        dropped_spans=dropped_spans,
+    )
+
+
+def fit_sections(sections: Dict[str, str], token_budget: int) -> Dict[str, BudgetedText]:
+    """
+    Fits several transcript sections that share one prompt into token_budget.
+    If they are over budget together, each gets a share of the budget
+    proportional to its size.
+    """
+    sizes = {name: count_tokens(text) for name, text in sections.items()}
+    total = sum(sizes.values())
+    if total <= token_budget:
+        return {name: compact_transcript(text) for name, text in sections.items()}
+    return {
+        name: compact_transcript(text, token_budget * sizes[name] // total)
+        for name, text in sections.items()
+    }
+
+
+def chunk_transcript(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits a transcript into consecutive chunks of at most max_tokens each,
+    breaking between lines, or between words for a line that is too long on its own.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    for line in text.splitlines():
+        pieces = [line]
+        if count_tokens(line) > max_tokens:
+            pieces, piece = [], []
+            for word in line.split():
+                if piece and count_tokens(" ".join(piece + [word])) > max_tokens:
+                    pieces.append(" ".join(piece))
+                    piece = []
+                piece.append(word)
+            pieces.append(" ".join(piece))
+        for piece in pieces:
+            cost = count_tokens(piece)
+            if current and used + cost > max_tokens:
+                chunks.append("\n".join(current))
+                current, used = [], 0
+            current.append(piece)
+            used += cost
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def transcript_times(text: str) -> List[int]:
+    """Returns the timestamps, in seconds, of the '[MM:SS]' lines of a transcript."""
+    return [seconds for seconds, _, _ in map(_split_line, text.splitlines()) if seconds is not None]
+
+
+def transcript_window(text: str, start: float, end: float) -> str:
+    """
+    Returns the lines of a '[MM:SS] Name: text' transcript stamped between start
+    and end seconds; lines without a timestamp go with the line before them.
+    """
+    lines = []
+    seconds = None
+    for line in text.splitlines():
+        seconds = _split_line(line)[0] if TIMESTAMP_RE.match(line) else seconds
+        if seconds is not None and start <= seconds <= end:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def budget_log_entry(call: str, sections: Dict[str, BudgetedText], token_budget: int) -> Dict[str, object]:
+    """Summarizes what compaction did for one LLM call, for the workflow state and the console."""
+    return {
+        "call": call,
+        "token_budget": token_budget,
+        "tokens_before": sum(s.tokens_before for s in sections.values()),
+        "tokens_after": sum(s.tokens_after for s in sections.values()),
+        "sections": {name: s.dict(exclude={"text"}) for name, s in sections.items()},
+    }
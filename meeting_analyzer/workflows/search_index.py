@@ -0,0 +1,267 @@
+# meeting_analyzer/workflows/search_index.py
+
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from typing import Dict, Any, List, Tuple
+
+# Optional: numpy makes vector search a single matrix product. Without it the
+# vector index is simply disabled and queries fall back to full-text search.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# --- CONFIGURATION ---
+
+# The "vector" index is a hashed bag of words, not a learned embedding: it is
+# lexical like FTS5, only scored by cosine similarity over whole documents, so
+# it finds no synonyms or paraphrases. Hybrid mode mixes the two rankings.
+VECTOR_DIM = 512  # Width of the hashed bag-of-words vectors.
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Columns returned with each hit; the transcript and embedding stay on disk.
+HIT_COLUMNS = "id, run_uuid, report_url, created_at, summary, property_data, final_decision"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_uuid TEXT UNIQUE NOT NULL,
+    report_url TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    action_items TEXT NOT NULL DEFAULT '',
+    property_data TEXT NOT NULL DEFAULT '{}',
+    final_decision TEXT NOT NULL DEFAULT '',
+    fused_transcript TEXT NOT NULL DEFAULT '',
+    embedding BLOB
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5(
+    summary, action_items, property_data, final_decision, fused_transcript,
+    content='meetings', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS meetings_ai AFTER INSERT ON meetings BEGIN
+    INSERT INTO meetings_fts(rowid, summary, action_items, property_data, final_decision, fused_transcript)
+    VALUES (new.id, new.summary, new.action_items, new.property_data, new.final_decision, new.fused_transcript);
+END;
+CREATE TRIGGER IF NOT EXISTS meetings_ad AFTER DELETE ON meetings BEGIN
+    INSERT INTO meetings_fts(meetings_fts, rowid, summary, action_items, property_data, final_decision, fused_transcript)
+    VALUES ('delete', old.id, old.summary, old.action_items, old.property_data, old.final_decision, old.fused_transcript);
+END;
+"""
+
+# Cached (version, row ids, normalized embedding matrix) per index file.
+# The version is read from the database on every query, so a worker process
+# picks up meetings indexed by any other process. Thousands of meetings fit
+# comfortably in memory.
+_vector_cache: Dict[str, Any] = {}
+_vector_lock = threading.Lock()
+# Index files whose schema has already been created by this process.
+_initialized_paths = set()
+_schema_lock = threading.Lock()
+
+
+# --- HELPER FUNCTIONS ---
+
+def _connect(index_path: str) -> sqlite3.Connection:
+    """Opens the index database, creating the schema once per process and file."""
+    with _schema_lock:
+        if index_path not in _initialized_paths:
+            os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(index_path, timeout=30)
+            try:
+                # WAL mode is stored in the database file, so it only needs setting once.
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            finally:
+                conn.close()
+            _initialized_paths.add(index_path)
+
+    conn = sqlite3.connect(index_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _tokenize(text: str) -> List[str]:
+    return [token.lower() for token in TOKEN_RE.findall(text or "")]
+
+
+def _embed(text: str) -> List[float]:
+    """
+    Builds a hashed, L2-normalized bag-of-words vector for the text.
+    Needs no model download and runs on CPU in microseconds per meeting,
+    but only matches documents that share words with the query.
+    """
+    vector = [0.0] * VECTOR_DIM
+    for token in _tokenize(text):
+        bucket = zlib.crc32(token.encode("utf-8"))
+        vector[bucket % VECTOR_DIM] += 1.0 if (bucket >> 31) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+def _document_text(analysis_report: Dict[str, Any], fused_transcript: str) -> str:
+    property_data = analysis_report.get("property_data", {}) or {}
+    return "\n".join([
+        analysis_report.get("summary", ""),
+        "\n".join(analysis_report.get("action_items", []) or []),
+        " ".join(f"{k} {v}" for k, v in property_data.items()),
+        analysis_report.get("final_decision", ""),
+        fused_transcript,
+    ])
+
+
+def _fts_query(query: str) -> str:
+    """Quotes each term so user input can never be parsed as FTS5 syntax."""
+    return " ".join(f'"{token}"' for token in _tokenize(query))
+
+
+def _row_to_hit(row: sqlite3.Row, score: float, snippet: str = "") -> Dict[str, Any]:
+    return {
+        "run_uuid": row["run_uuid"],
+        "report_url": row["report_url"],
+        "created_at": row["created_at"],
+        "summary": row["summary"],
+        "property_data": json.loads(row["property_data"] or "{}"),
+        "final_decision": row["final_decision"],
+        "snippet": snippet,
+        "score": score,
+    }
+
+
+# --- PUBLIC API ---
+
+def index_meeting(index_path: str, run_uuid: str, analysis_report: Dict[str, Any],
+                  fused_transcript: str, report_url: str = "") -> None:
+    """Persists one completed analysis and adds it to the full-text and vector indexes."""
+    embedding = None
+    if np is not None:
+        embedding = array("f", _embed(_document_text(analysis_report, fused_transcript))).tobytes()
+
+    conn = _connect(index_path)
+    try:
+        with conn:
+            # Re-indexing the same run replaces the previous entry.
+            conn.execute("DELETE FROM meetings WHERE run_uuid = ?", (run_uuid,))
+            conn.execute(
+                "INSERT INTO meetings (run_uuid, report_url, created_at, summary, action_items, "
+                "property_data, final_decision, fused_transcript, embedding) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_uuid,
+                    report_url,
+                    time.time(),
+                    analysis_report.get("summary", ""),
+                    "\n".join(analysis_report.get("action_items", []) or []),
+                    json.dumps(analysis_report.get("property_data", {}) or {}),
+                    analysis_report.get("final_decision", ""),
+                    fused_transcript,
+                    embedding,
+                ),
+            )
+    finally:
+        conn.close()
+
+
+def _load_vectors(conn: sqlite3.Connection, index_path: str):
+    """Returns (row ids, embedding matrix), reloading when the stored embeddings changed."""
+    # Re-indexing deletes and re-inserts, so MAX(id) moves on every write and
+    # COUNT(*) catches deletions; together they identify the current contents.
+    version = tuple(conn.execute(
+        "SELECT MAX(id), COUNT(*) FROM meetings WHERE embedding IS NOT NULL").fetchone())
+    with _vector_lock:
+        cached = _vector_cache.get(index_path)
+        if cached is None or cached[0] != version:
+            rows = conn.execute("SELECT id, embedding FROM meetings WHERE embedding IS NOT NULL").fetchall()
+            ids = [row["id"] for row in rows]
+            matrix = np.frombuffer(b"".join(row["embedding"] for row in rows), dtype=np.float32)
+            cached = (version, ids, matrix.reshape(len(ids), VECTOR_DIM))
+            _vector_cache[index_path] = cached
+        return cached[1], cached[2]
+
+
+def _rank_fts(conn: sqlite3.Connection, match: str, limit: int) -> List[Tuple[int, float]]:
+    """Returns (meeting id, score) for the best keyword matches, read from the FTS index alone."""
+    if not match:
+        return []
+    rows = conn.execute(
+        "SELECT rowid, rank FROM meetings_fts WHERE meetings_fts MATCH ? ORDER BY rank LIMIT ?",
+        (match, limit),
+    ).fetchall()
+    # FTS5's rank is bm25(), which is lower-is-better; flip the sign so higher scores rank first.
+    return [(row["rowid"], -row["rank"]) for row in rows]
+
+
+def _rank_vector(conn: sqlite3.Connection, index_path: str, query: str, limit: int) -> List[Tuple[int, float]]:
+    """Returns (meeting id, cosine similarity) for the closest hashed vectors."""
+    ids, matrix = _load_vectors(conn, index_path)
+    if not ids:
+        return []
+    scores = matrix @ np.asarray(_embed(query), dtype=np.float32)
+    return [(ids[i], float(scores[i])) for i in np.argsort(-scores)[:limit] if scores[i] > 0]
+
+
+def _build_hits(conn: sqlite3.Connection, ranked: List[Tuple[int, float]], match: str) -> List[Dict[str, Any]]:
+    """
+    Loads the result columns for the ranked meetings and a keyword snippet for
+    each, so full transcripts are only read for the rows actually returned.
+    """
+    if not ranked:
+        return []
+    ids = [meeting_id for meeting_id, _ in ranked]
+    rows = {row["id"]: row for row in conn.execute(
+        f"SELECT {HIT_COLUMNS} FROM meetings WHERE id IN ({','.join('?' * len(ids))})", ids)}
+    hits = []
+    for meeting_id, score in ranked:
+        snippet = None
+        if match:
+            snippet = conn.execute(
+                "SELECT snippet(meetings_fts, -1, '[', ']', ' ... ', 16) FROM meetings_fts "
+                "WHERE meetings_fts MATCH ? AND rowid = ?", (match, meeting_id)).fetchone()
+        hits.append(_row_to_hit(rows[meeting_id], score, snippet[0] if snippet else ""))
+    return hits
+
+
+def search_meetings(index_path: str, query: str, limit: int = 10, mode: str = "fts") -> Dict[str, Any]:
+    """
+    Searches indexed meetings.
+    mode is 'fts' (ranked keyword search), 'vector' (cosine similarity of hashed
+    bag-of-words vectors; lexical, not semantic) or 'hybrid' (reciprocal-rank
+    fusion of both).
+    """
+    if mode in ("vector", "hybrid") and np is None:
+        raise ValueError("Vector search requires numpy; use mode='fts'.")
+    if mode not in ("fts", "vector", "hybrid"):
+        raise ValueError(f"Unknown search mode: {mode}")
+
+    started = time.perf_counter()
+    match = _fts_query(query)
+    conn = _connect(index_path)
+    try:
+        if mode == "fts":
+            ranked = _rank_fts(conn, match, limit)
+        elif mode == "vector":
+            ranked = _rank_vector(conn, index_path, query, limit)
+        else:
+            fused: Dict[int, float] = {}
+            for ranking in (_rank_fts(conn, match, limit * 2), _rank_vector(conn, index_path, query, limit * 2)):
+                for rank, (meeting_id, _) in enumerate(ranking):
+                    fused[meeting_id] = fused.get(meeting_id, 0.0) + 1.0 / (60 + rank)
+            ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+        # Vector hits need not contain the query words, so they get no snippet.
+        hits = _build_hits(conn, ranked, "" if mode == "vector" else match)
+    finally:
+        conn.close()
+
+    return {
+        "query": query,
+        "mode": mode,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": hits,
+    }
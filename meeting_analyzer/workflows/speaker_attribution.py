@@ -0,0 +1,289 @@
+# meeting_analyzer/workflows/speaker_attribution.py
+
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+
+# --- CONFIGURATION ---
+
+# Whisper offsets and Meet wall-clock times never line up exactly, so segments
+# are matched against utterances within this many seconds on either side.
+ALIGNMENT_TOLERANCE = 2.0
+# Meet only logs when a turn starts; its length is estimated from its word
+# count at this speaking rate. Turns may overlap each other.
+WORDS_PER_SECOND = 2.5
+MIN_UTTERANCE_SECONDS = 1.0
+# Text similarity decides the speaker; time overlap only breaks ties and
+# covers segments that share no words with any turn.
+TIME_WEIGHT = 0.2
+# Largest offset between the video start and the Meet transcript start that
+# is considered, and words too common to vote on it.
+MAX_OFFSET_SECONDS = 3600
+MAX_WORD_OCCURRENCES = 20
+
+TIME_FORMAT = "%I:%M:%S %p"
+STARTED_RE = re.compile(r"^Transcript, started at (\d{1,2}:\d{2}:\d{2} [AP]M)")
+ROSTER_RE = re.compile(r"^Initial people present at (\d{1,2}:\d{2}:\d{2} [AP]M)")
+EVENT_RE = re.compile(r"^<(\d{1,2}:\d{2}:\d{2} [AP]M)> (.+?)\s+(joined|left) the conference$")
+LINE_RE = re.compile(r"^<(\d{1,2}:\d{2}:\d{2} [AP]M)> ([^:]+?)\s*: ?(.*)$")
+WORD_RE = re.compile(r"\w+")
+
+
+class Utterance(BaseModel):
+    """A single speaker turn, with times in seconds from the start of the meeting."""
+    start: float
+    end: float
+    speaker: str
+    text: str
+
+
+class MeetTranscript(BaseModel):
+    """Speaker turns and presence intervals parsed from a Google Meet transcript."""
+    utterances: List[Utterance] = Field(default_factory=list)
+    presence: Dict[str, List[Tuple[float, Optional[float]]]] = Field(default_factory=dict)
+
+    def is_present(self, speaker: str, at: float) -> bool:
+        intervals = self.presence.get(speaker)
+        if not intervals:
+            # Someone who speaks without a join event was present all along.
+            return True
+        return any(joined - ALIGNMENT_TOLERANCE <= at and (left is None or at <= left + ALIGNMENT_TOLERANCE)
+                   for joined, left in intervals)
+
+
+# --- HELPER FUNCTIONS ---
+
+def _seconds(clock: str, origin: datetime) -> float:
+    delta = (datetime.strptime(clock, TIME_FORMAT) - origin).total_seconds()
+    # Meetings that run past midnight wrap around the 12-hour clock.
+    return delta + 86400 if delta < 0 else delta
+
+
+def _words(text: str) -> set:
+    return {word.lower() for word in WORD_RE.findall(text)}
+
+
+def format_offset(seconds: float) -> str:
+    """Formats an offset in seconds as [MM:SS] (or [H:MM:SS] past the hour)."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"[{hours}:{minutes:02d}:{secs:02d}]" if hours else f"[{minutes:02d}:{secs:02d}]"
+
+
+def parse_meet_transcript(text: str) -> MeetTranscript:
+    """
+    Parses a Google Meet transcript: the initial roster, join/leave events and
+    '<time> Name: text' lines, including wrapped continuation lines.
+    """
+    origin = None
+    in_roster = False
+    transcript = MeetTranscript()
+    turns: List[List[Any]] = []
+    # Meet logs one event per connection, so a person may join twice before
+    # leaving once; they stay present until every connection has left.
+    open_sessions: Dict[str, int] = {}
+    # The join events logged at the start repeat the roster; count them once.
+    roster: Dict[str, int] = {}
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+
+        match = STARTED_RE.match(line) or ROSTER_RE.match(line)
+        if match:
+            origin = origin or datetime.strptime(match.group(1), TIME_FORMAT)
+            in_roster = bool(ROSTER_RE.match(line))
+            continue
+
+        if not raw_line.startswith("<"):
+            if in_roster and raw_line.startswith("\t") and line:
+                roster[line] = roster.get(line, 0) + 1
+                open_sessions[line] = open_sessions.get(line, 0) + 1
+                transcript.presence.setdefault(line, [(0.0, None)])
+            elif turns and raw_line[:1].isspace() and line:
+                turns[-1][2] += " " + line
+            continue
+        in_roster = False
+
+        event = EVENT_RE.match(line)
+        spoken = None if event else LINE_RE.match(line)
+        if not event and not spoken:
+            continue
+
+        clock = (event or spoken).group(1)
+        if origin is None:
+            origin = datetime.strptime(clock, TIME_FORMAT)
+        at = _seconds(clock, origin)
+
+        if event:
+            name, action = event.group(2).strip(), event.group(3)
+            intervals = transcript.presence.setdefault(name, [])
+            if action == "joined":
+                if at == 0.0 and roster.get(name):
+                    roster[name] -= 1
+                    continue
+                if not open_sessions.get(name):
+                    intervals.append((at, None))
+                open_sessions[name] = open_sessions.get(name, 0) + 1
+            elif open_sessions.get(name):
+                open_sessions[name] -= 1
+                if not open_sessions[name]:
+                    intervals[-1] = (intervals[-1][0], at)
+        else:
+            turns.append([at, spoken.group(2).strip(), spoken.group(3).strip()])
+
+    for start, speaker, words in turns:
+        duration = max(MIN_UTTERANCE_SECONDS, len(WORD_RE.findall(words)) / WORDS_PER_SECOND)
+        transcript.utterances.append(Utterance(start=start, end=start + duration, speaker=speaker, text=words))
+
+    return transcript
+
+
+def _word_weights(meet: MeetTranscript) -> Dict[str, float]:
+    """Inverse document frequency of each word across Meet turns, so rare words count most."""
+    document_counts = Counter(word for u in meet.utterances for word in _words(u.text))
+    total = len(meet.utterances) + 1
+    return {word: math.log(total / count) + 0.1 for word, count in document_counts.items()}
+
+
+def _timed_words(text: str, start: float, end: float) -> List[Tuple[str, float]]:
+    """Spreads the words of a span evenly over its time range."""
+    words = [word.lower() for word in WORD_RE.findall(text)]
+    step = (end - start) / max(1, len(words))
+    return [(word, start + i * step) for i, word in enumerate(words)]
+
+
+def estimate_offset(whisper_output: Dict[str, Any], meet: MeetTranscript) -> float:
+    """
+    Estimates how many seconds after the Meet transcript start the video began,
+    so that meet_time = whisper_time + offset. Every pair of occurrences of a
+    shared, reasonably rare word votes for the difference of their times; the
+    best-supported offset (smoothed over neighbouring seconds) wins.
+    Returns 0.0 when the transcripts share no usable words.
+    """
+    meet_times: Dict[str, List[float]] = {}
+    for u in meet.utterances:
+        for word, at in _timed_words(u.text, u.start, u.end):
+            meet_times.setdefault(word, []).append(at)
+    whisper_times: Dict[str, List[float]] = {}
+    for segment in whisper_output.get("segments", []):
+        for word, at in _timed_words(segment.get("text", ""), float(segment.get("start", 0.0)),
+                                     float(segment.get("end", 0.0))):
+            whisper_times.setdefault(word, []).append(at)
+
+    votes: Counter = Counter()
+    for word, times in whisper_times.items():
+        targets = meet_times.get(word)
+        if not targets or len(targets) > MAX_WORD_OCCURRENCES or len(times) > MAX_WORD_OCCURRENCES:
+            continue
+        weight = 1.0 / (len(targets) * len(times))
+        for whisper_at in times:
+            for meet_at in targets:
+                offset = round(meet_at - whisper_at)
+                if abs(offset) <= MAX_OFFSET_SECONDS:
+                    votes[offset] += weight
+
+    if not votes:
+        return 0.0
+    window = (-2, -1, 0, 1, 2)
+    smoothed = {offset: sum(votes.get(offset + d, 0.0) for d in window) for offset in votes}
+    peak = max(smoothed, key=lambda offset: (smoothed[offset], -abs(offset)))
+    # Refine to the vote-weighted mean around the peak for sub-second precision.
+    return round(sum((peak + d) * votes.get(peak + d, 0.0) for d in window) / smoothed[peak], 1)
+
+
+def _candidate_scores(meet: MeetTranscript, start: float, end: float, segment_words: set,
+                      weights: Dict[str, float], present_only: bool) -> Dict[str, float]:
+    """Scores speakers whose turns lie near the segment, mostly by shared rare words."""
+    midpoint = (start + end) / 2
+    segment_weight = sum(weights.get(word, 1.0) for word in segment_words) or 1.0
+    scores: Dict[str, float] = {}
+    for utterance in meet.utterances:
+        window_start = utterance.start - ALIGNMENT_TOLERANCE
+        window_end = utterance.end + ALIGNMENT_TOLERANCE
+        if window_start > end or window_end < start:
+            continue
+        if present_only and not meet.is_present(utterance.speaker, midpoint):
+            continue
+        shared = segment_words & _words(utterance.text)
+        text_score = sum(weights.get(word, 1.0) for word in shared) / segment_weight
+        overlap = (min(end, window_end) - max(start, window_start)) / max(end - start, MIN_UTTERANCE_SECONDS)
+        score = text_score + TIME_WEIGHT * min(1.0, overlap)
+        scores[utterance.speaker] = max(scores.get(utterance.speaker, 0.0), score)
+    return scores
+
+
+def _pick_speaker(meet: MeetTranscript, start: float, end: float, text: str,
+                  weights: Dict[str, float]) -> Optional[str]:
+    """Chooses the speaker for a segment (in Meet time) by shared words, then time overlap."""
+    midpoint = (start + end) / 2
+    segment_words = _words(text)
+
+    # Prefer speakers the roster says were in the room; the roster can miss
+    # reconnects, so fall back to anyone whose turn overlaps the segment.
+    scores = (_candidate_scores(meet, start, end, segment_words, weights, present_only=True)
+              or _candidate_scores(meet, start, end, segment_words, weights, present_only=False))
+    if scores:
+        return max(scores, key=scores.get)
+
+    # No nearby turn: fall back to the last present speaker before this segment.
+    for utterance in reversed(meet.utterances):
+        if utterance.start <= midpoint and meet.is_present(utterance.speaker, midpoint):
+            return utterance.speaker
+    return None
+
+
+# --- PUBLIC API ---
+
+def attribute_speakers(whisper_output: Dict[str, Any], google_transcript: str,
+                       offset: Optional[float] = None) -> str:
+    """
+    Labels each Whisper segment with a speaker taken from the Google Meet
+    transcript and returns '[MM:SS] Name: text' lines, merging consecutive
+    segments from the same speaker. offset is how many seconds after the Meet
+    transcript start the video began; it is estimated when not given.
+    Output timestamps stay relative to the video. Raises ValueError if the
+    Google transcript is not in Meet format.
+    """
+    meet = parse_meet_transcript(google_transcript)
+    if not meet.utterances:
+        raise ValueError("The Google transcript has no Google Meet speaker turns to attribute from.")
+    if offset is None:
+        offset = estimate_offset(whisper_output, meet)
+    weights = _word_weights(meet)
+    lines: List[List[Any]] = []
+
+    for segment in whisper_output.get("segments", []):
+        text = segment.get("text", "").strip()
+        if not text:
+            continue
+        start, end = float(segment.get("start", 0.0)), float(segment.get("end", 0.0))
+        speaker = _pick_speaker(meet, start + offset, end + offset, text, weights) or "Unknown"
+        if lines and lines[-1][1] == speaker:
+            lines[-1][2] += " " + text
+        else:
+            lines.append([start, speaker, text])
+
+    return "\n".join(f"{format_offset(start)} {speaker}: {text}" for start, speaker, text in lines)
+
+
+def format_segments(whisper_output: Dict[str, Any]) -> str:
+    """Renders Whisper segments as '[MM:SS] text' lines, without speakers."""
+    return "\n".join(f"{format_offset(float(segment.get('start', 0.0)))} {segment['text'].strip()}"
+                     for segment in whisper_output.get("segments", []) if segment.get("text", "").strip())
+
+
+def compact_meet_transcript(google_transcript: str) -> str:
+    """
+    Renders only the spoken lines of a Google Meet transcript as '[MM:SS] Name: text',
+    dropping the roster, join/leave events and line wrapping. Returns the input
+    unchanged if it is not in Meet format.
+    """
+    meet = parse_meet_transcript(google_transcript)
+    if not meet.utterances:
+        return google_transcript
+    return "\n".join(f"{format_offset(u.start)} {u.speaker}: {u.text}" for u in meet.utterances)
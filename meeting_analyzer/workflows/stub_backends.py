@@ -0,0 +1,71 @@
+# meeting_analyzer/workflows/stub_backends.py
+
+import json
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from .speaker_attribution import parse_meet_transcript
+
+
+# Stand-ins for the Whisper CLI and the Gemini models, used to load-test the
+# Django entry points without a GPU or API quota. Each stub sleeps for its
+# configured latency and returns output shaped like the real backend's; the
+# fusion and analysis nodes themselves run unchanged on top of StubChatModel.
+# Nodes receive the WorkflowState; it is not imported here to avoid a cycle.
+
+STUB_REPORT = {
+    "summary": "Stubbed analysis of a synthetic property approval meeting.",
+    "action_items": ["Confirm signage dimensions with the landlord."],
+    "property_data": {"Site Name": "Synthetic Site", "Store Size": "1950 sq ft", "Signage": "18 ft x 3.5 ft"},
+    "final_decision": "approved",
+}
+
+
+def make_stub_whisper(latency: float) -> Callable[[Any], Dict[str, Any]]:
+    """Returns a node that fakes Whisper by turning the Google transcript turns into segments."""
+    def stub_whisper(state) -> Dict[str, Any]:
+        time.sleep(latency)
+        meet = parse_meet_transcript(state.google_transcript)
+        segments = [
+            {"id": i, "start": u.start, "end": u.end, "text": u.text}
+            for i, u in enumerate(meet.utterances)
+        ]
+        return {"whisper_transcript": json.dumps({"text": " ".join(s["text"] for s in segments),
+                                                  "segments": segments, "language": "en"})}
+    return stub_whisper
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Stands in for the Gemini chat models. Each call sleeps for `latency`
+    seconds and echoes the last section of the prompt (the transcript text
+    after the final '---' header) with finish_reason STOP, so the real nodes
+    still build, compact and chunk their prompts. Structured output returns
+    STUB_REPORT.
+    """
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        content = messages[-1].content
+        if isinstance(content, list):
+            content = "\n".join(part for part in content if isinstance(part, str))
+        reply = content.rsplit("---\n", 1)[-1]
+        message = AIMessage(content=reply, response_metadata={"finish_reason": "STOP"})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Runnable:
+        def analyze(messages: Any) -> Any:
+            time.sleep(self.latency)
+            return schema(**STUB_REPORT)
+        return RunnableLambda(analyze)
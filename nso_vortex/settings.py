@@ -19,6 +19,13 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+# SQLite file holding the full-text/vector search index of completed analyses
+MEETING_INDEX_PATH = os.path.join(MEDIA_ROOT, 'meeting_index.sqlite3')
+
+# Replace Whisper and Gemini with sleep-based stubs, e.g. {'whisper': 2.0, 'llm': 1.0}
+# (seconds per call). Used by load_test.py; leave as None to call the real backends.
+ANALYZER_STUB_LATENCY = None
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
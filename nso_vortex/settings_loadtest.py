@@ -0,0 +1,38 @@
+"""
+Django settings for load-testing nso_vortex with stubbed Whisper and Gemini backends.
+
+Used by load_test.py, which sets DJANGO_SETTINGS_MODULE to this module and
+points NSO_LOADTEST_DIR at a scratch directory so the real database, uploads
+and reports are never touched.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+import os
+
+LOADTEST_DIR = os.environ.get('NSO_LOADTEST_DIR', os.path.join(BASE_DIR, 'loadtest_run'))
+
+DEBUG = False
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+
+# Innermost, so the header it adds times the view alone; load_test.py derives
+# server-side queueing from it.
+MIDDLEWARE = MIDDLEWARE + ['meeting_analyzer.middleware.ViewTimingMiddleware']
+
+MEDIA_ROOT = os.path.join(LOADTEST_DIR, 'media')
+MEETING_INDEX_PATH = os.path.join(MEDIA_ROOT, 'meeting_index.sqlite3')
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(LOADTEST_DIR, 'db.sqlite3'),
+        # Concurrent workers write task status; wait for the lock instead of failing.
+        'OPTIONS': {'timeout': 30},
+    }
+}
+
+# Seconds each stubbed backend call sleeps for
+ANALYZER_STUB_LATENCY = {
+    'whisper': float(os.environ.get('NSO_STUB_WHISPER_LATENCY', '2.0')),
+    'llm': float(os.environ.get('NSO_STUB_LLM_LATENCY', '1.0')),
+}
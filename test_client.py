@@ -1,44 +1,30 @@
 import requests
 import json
 import os
+import sys
 
 # Define the base URL of your Django server.
 # This assumes the server is running locally on port 8000.
-BASE_URL = "http://127.0.0.1:8000/meeting-agent/"
-ENDPOINT = "process-transcript/"
+BASE_URL = "http://127.0.0.1:8000/"
+ENDPOINT = "start-analysis/"
+STATUS_ENDPOINT = "tasks/{task_id}/status/"
 
+DEFAULT_TRANSCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "transcript_google.txt")
 
-def test_api():
-    """
-    Sends a POST request with a sample meeting transcript to the Django backend
-    and prints the structured response.
+
+def run_client(ppt_path, video_path, transcript_path=DEFAULT_TRANSCRIPT):
     """
-    sample_transcript = """
-    Attendees: John, Jane, Sarah
-    Date: October 26, 2023
-
-    Jane: Hi everyone, thanks for joining. Let's start with the Q3 marketing campaign. The preliminary results are in, and we've seen a 15% increase in lead generation.
-    John: That's great news, Jane. I've been working on the new website landing page to support the campaign. I should have a final draft ready for review by next Friday.
-    Sarah: Excellent. Regarding the social media strategy, I think we should increase the ad spend on Instagram. I'll get the budget analysis completed and send it to John and Jane for approval by the end of the week.
-    Jane: Sounds good, Sarah. John, once you have the final draft of the landing page, please share it with the team so we can provide feedback before the launch. The goal is to get it live by November 15th.
-    John: Will do. Thanks.
-    Sarah: I'll also follow up with the creative team about the new ad visuals. I'll ping them for an update tomorrow.
-    Jane: Perfect. Let's touch base again next week to review progress.
+    Uploads a PPT, a meeting video and a Google Meet transcript to the Django backend,
+    prints the analysis response, then looks up the task status.
     """
-
-    # Create the payload with the transcript
-    payload = {
-        "transcript": sample_transcript
-    }
-
     try:
-        # Send the POST request to the API endpoint
-        print(f"Sending transcript to {BASE_URL}{ENDPOINT}...")
-        response = requests.post(
-            f"{BASE_URL}{ENDPOINT}",
-            json=payload,
-            headers={"Content-Type": "application/json"}
-        )
+        # Send the POST request with the three files to the API endpoint
+        print(f"Uploading files to {BASE_URL}{ENDPOINT}...")
+        with open(ppt_path, "rb") as ppt, open(video_path, "rb") as video, open(transcript_path, "rb") as transcript:
+            response = requests.post(
+                f"{BASE_URL}{ENDPOINT}",
+                files={"ppt_file": ppt, "video_file": video, "transcript_file": transcript},
+            )
 
         # Raise an exception for bad status codes (e.g., 404, 500)
         response.raise_for_status()
@@ -47,10 +33,17 @@ def test_api():
         print("\n--- Response from Server ---")
         print(json.dumps(response.json(), indent=2))
 
+        status_url = f"{BASE_URL}{STATUS_ENDPOINT.format(task_id=response.json()['task_id'])}"
+        print(f"\n--- Task Status ({status_url}) ---")
+        print(json.dumps(requests.get(status_url).json(), indent=2))
+
     except requests.exceptions.RequestException as e:
         print(f"\nAn error occurred: {e}")
         print("Please make sure your Django server is running.")
 
 
 if __name__ == "__main__":
-    test_api()
+    if len(sys.argv) < 3:
+        print("Usage: python test_client.py <ppt_file> <video_file> [transcript_file]")
+        sys.exit(1)
+    run_client(*sys.argv[1:4])